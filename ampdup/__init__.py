@@ -1,13 +1,51 @@
 # pylint: skip-file
 
-from .errors import *
+from .connection import SocketOptions
+from .errors import (
+    ClientTypeError,
+    CommandError,
+    ConnectionFailedError,
+    MPDError,
+    NoCurrentSongError,
+    URINotFoundError,
+)
 from .idle_client import IdleMPDClient
 from .mpd_client import MPDClient
-from .types import *
+from .pool import MPDClientPool
+from .types import (
+    SearchType,
+    Single,
+    Snapshot,
+    Song,
+    SongId,
+    State,
+    Stats,
+    Status,
+    Subsystem,
+    Tag,
+    TimeRange,
+)
 
 __all__ = [
     'IdleMPDClient',
     'MPDClient',
-    *errors.__all__,  # type: ignore
-    *types.__all__,  # type: ignore
+    'MPDClientPool',
+    'SocketOptions',
+    'MPDError',
+    'ConnectionFailedError',
+    'ClientTypeError',
+    'NoCurrentSongError',
+    'CommandError',
+    'URINotFoundError',
+    'SearchType',
+    'Single',
+    'Snapshot',
+    'Song',
+    'SongId',
+    'State',
+    'Stats',
+    'Status',
+    'Subsystem',
+    'Tag',
+    'TimeRange',
 ]
@@ -1,38 +1,329 @@
 """Base client for MPD."""
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
-from functools import partial
 from pathlib import Path
-from typing import AsyncIterator, List, Optional
-
-from anyio import create_memory_object_stream, create_task_group
-from anyio.abc import ObjectStream, TaskGroup
-from anyio.streams.stapled import StapledObjectStream
-
-from .connection import Connection, Connector, Socket
-from .errors import ConnectionFailedError
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Deque,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from anyio import (
+    CancelScope,
+    Event,
+    Semaphore,
+    WouldBlock,
+    create_task_group,
+    get_cancelled_exc_class,
+)
+from anyio.abc import TaskGroup
+
+from .connection import (
+    Connection,
+    Connector,
+    SocketOptions,
+    TCPConnector,
+    UnixConnector,
+)
+from .errors import ClientTypeError, ConnectionFailedError, MPDError
 from .future import Future
 from .parsing import parse_error
-from .util import asynccontextmanager
+from .util import DATACLASS_SLOTS, asynccontextmanager
 
 RawCommandResult = List[str]
 
+T = TypeVar('T')
+
+# The lines that end a response, each with the newline before it. Responses
+# are scanned for these with bytes.find, which runs in C, instead of
+# checking every line in Python.
+TERMINATORS = (b'\nOK\n', b'\nACK ', b'\nlist_OK\n')
+LONGEST_TERMINATOR = max(len(t) for t in TERMINATORS)
+
+DEFAULT_MAX_IN_FLIGHT = 64
+
+
+def find_terminator(buffer: bytearray, start: int) -> int:
+    """Find the line that ends a response in a buffer of received data.
+
+    Args:
+        buffer: The received data, where every line is preceded by a newline.
+        start: Where to start searching.
+
+    Returns:
+        The position of the newline before the first terminator line, or -1
+        if there is none yet.
+    """
+    find = buffer.find
+    end = -1
+
+    for terminator in TERMINATORS:
+        i = find(terminator, start)
+        if i >= 0 and (end < 0 or i < end):
+            end = i
+
+    return end
+
+
+def not_connected(*_args: Any) -> Any:
+    """Stand in for I/O methods while there is no connection.
+
+    This raises as soon as it is called, before any awaitable is created.
+    """
+    raise ConnectionFailedError('Connection is not established.')
+
 
-def make_object_stream() -> ObjectStream:
-    """Create a stapled object stream."""
-    return StapledObjectStream(*create_memory_object_stream())
+@dataclass
+class PendingCommandList:
+    """The futures for every command in a command list, in order."""
+
+    futures: List[Future[RawCommandResult]]
+
+
+PendingReply = Union[Future[RawCommandResult], PendingCommandList]
 
 
 @dataclass
+class CommandPipeline:
+    """Commands collected to be run together as a command list.
+
+    Members:
+        commands: The commands to run, in order.
+        results: The raw result of each command, available after the
+                 pipeline is run.
+    """
+
+    commands: List[str] = field(default_factory=list)
+    results: List[RawCommandResult] = field(default_factory=list)
+
+    def add(self, command: str) -> None:
+        """Add a command to the end of the pipeline."""
+        self.commands.append(command)
+
+
+class RecordedCommand:
+    """Awaitable standing in for running a command while building a batch.
+
+    Awaiting it suspends the awaiting coroutine and hands the command to
+    whoever is driving it, which later resumes it with the command's result.
+    """
+
+    __slots__ = ('command',)
+
+    def __init__(self, command: str):
+        self.command = command
+
+    def __await__(
+        self,
+    ) -> Generator[RecordedCommand, RawCommandResult, RawCommandResult]:
+        return (yield self)
+
+
+class RecordingConnection:
+    """Stands in for the connection of a client while a call is recorded.
+
+    Anything reaching for the connection, such as a command list, a nested
+    batch or a disconnection, fails before it has any effect.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Any:
+        raise ClientTypeError('Only calls that run a single command can be batched.')
+
+
+RECORDING = RecordingConnection()
+
+BatchedCall = Tuple[Coroutine[Any, Any, Any], Future[Any], str]
+
+
+@dataclass
+class CommandBatch:
+    """Client method calls collected to be run together as a command list.
+
+    Each call is started right away, but the command it runs is only
+    recorded. When the batch is run, every call is resumed with its own
+    result, so it is parsed just like when the method is awaited directly.
+
+    Members:
+        client: The client whose method calls are batched.
+    """
+
+    client: BaseMPDClient
+    _calls: List[BatchedCall] = field(default_factory=list, init=False, repr=False)
+
+    def add(self, call: Coroutine[Any, Any, T]) -> Future[T]:
+        """Add a call to a client method that runs a single command.
+
+        The call runs up to its command right away, so it must not reach the
+        server in any other way, or through another client.
+
+        Args:
+            call: The (not awaited) call, such as `client.status()`.
+
+        Returns:
+            A future that is set to the call's result once the batch runs.
+
+        Raises:
+            ClientTypeError: If the call is a method of another client, or
+                             does anything but run a single command.
+        """
+        frame = getattr(call, 'cr_frame', None)
+        owner = frame.f_locals.get('self') if frame is not None else None
+
+        if isinstance(owner, BaseMPDClient) and owner is not self.client:
+            call.close()
+            raise ClientTypeError('Only calls to the batching client can be batched.')
+
+        future: Future[T] = Future()
+
+        try:
+            command = self._resume(call, None)
+        except StopIteration as e:
+            # The call finished without running any command.
+            future.set(e.value)
+            return future
+
+        if command is None:
+            raise ClientTypeError('Only calls that run a command can be batched.')
+
+        self._calls.append((call, future, command))
+        return future
+
+    async def execute(self) -> None:
+        """Run every call added so far as one command list.
+
+        If a command fails, MPD does not run the ones after it, and the futures
+        of every call in the list fail with the error. If running the list is
+        cancelled, they fail with an MPDError, as the list may still have been
+        sent and run.
+        """
+        calls, self._calls = self._calls, []
+
+        if not calls:
+            return
+
+        try:
+            results = await self.client.run_commands([c for _, _, c in calls])
+        except BaseException as e:
+            # The futures are failed even on cancellation, since other tasks
+            # may be waiting on them.
+            error = (
+                e
+                if isinstance(e, Exception)
+                else MPDError('The batch was cancelled; its commands may have run.')
+            )
+
+            for call, future, _ in calls:
+                call.close()
+                future.fail(error)
+            raise
+
+        for (call, future, _), result in zip(calls, results):
+            try:
+                self._resume(call, result)
+            except StopIteration as e:
+                future.set(e.value)
+            except Exception as e:  # pylint: disable=broad-except
+                future.fail(e)
+            else:
+                call.close()
+                future.fail(
+                    ClientTypeError('Only calls that run one command can be batched.')
+                )
+
+    def discard(self) -> None:
+        """Drop every call added so far without running it."""
+        calls, self._calls = self._calls, []
+
+        for call, future, _ in calls:
+            call.close()
+            future.fail(MPDError('The batch was not run.'))
+
+    def _resume(
+        self, call: Coroutine[Any, Any, Any], result: Optional[RawCommandResult]
+    ) -> Optional[str]:
+        # Runs the call until it awaits its next command, with the client
+        # recording commands instead of running them, and its connection out
+        # of reach. Nothing else runs meanwhile, since the call never reaches
+        # the event loop.
+        # pylint: disable=protected-access
+        client = self.client
+        run_command = client._run_command
+        connection = client.connection
+        client._run_command = RecordedCommand
+        client.connection = RECORDING  # type: ignore
+
+        try:
+            recorded = call.send(result)
+        finally:
+            client._run_command = run_command
+            client.connection = connection
+
+        if not isinstance(recorded, RecordedCommand):
+            call.close()
+            return None
+
+        return recorded.command
+
+
+@dataclass(**DATACLASS_SLOTS)
 class MPDConnection:
-    """A high-level connection to an MPD server."""
+    """A high-level connection to an MPD server.
+
+    Replies are read by a single task (the reply loop), which takes pending
+    replies in the same order commands were sent. Since there is exactly one
+    consumer, the queue is a plain deque and an Event wakes the loop up when
+    it runs out of work. A command sent while no other reply is awaited is
+    answered by reading its reply inline, without involving the reply loop.
+
+    At most max_in_flight commands (or command lists) are sent without a
+    reply at any time. Commands beyond that wait for earlier replies before
+    being written, so a slow server does not get an ever-growing backlog.
+    """
 
     task_group: TaskGroup
-    pending_commands: ObjectStream[Future[RawCommandResult]] = field(
-        default_factory=make_object_stream
-    )
     connection: Optional[Connection] = None
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    _in_flight: Semaphore = field(init=False, repr=False)
+    # Created by _start_loop, so they live as long as the established
+    # connection and start clean on every reconnect.
+    _pending: Deque[PendingReply] = field(init=False, repr=False)
+    _has_pending: Event = field(init=False, repr=False)
+    _buffer: bytearray = field(init=False, repr=False)
+    _write_buffer: bytearray = field(init=False, repr=False)
+    _flushing: bool = field(init=False, repr=False)
+    # Whether a reply is being read, either inline or by the reply loop.
+    _reading: bool = field(init=False, repr=False)
+    _timeout_seconds: Optional[float] = field(init=False, repr=False)
+    _future_pool: List[Future[RawCommandResult]] = field(
+        default_factory=list, init=False, repr=False
+    )
+    # Bound to the established connection's methods, so the per-command path
+    # does not check whether there is one.
+    _write_line: Callable[[str], Awaitable[None]] = field(
+        default_factory=lambda: not_connected, init=False, repr=False
+    )
+    _read_available: Callable[..., Awaitable[bytes]] = field(
+        default_factory=lambda: not_connected, init=False, repr=False
+    )
+    _write: Callable[[bytes], Awaitable[None]] = field(
+        default_factory=lambda: not_connected, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        self._in_flight = Semaphore(self.max_in_flight)
 
     async def _connect(self, timeout_seconds: Optional[float]) -> None:
         assert self.connection is not None
@@ -40,6 +331,10 @@ class MPDConnection:
         self._start_loop(timeout_seconds)
 
     async def _disconnect(self) -> None:
+        self._write_line = not_connected
+        self._read_available = not_connected
+        self._write = not_connected
+
         if self.connection is not None:
             await self.connection.aclose()
 
@@ -62,60 +357,260 @@ class MPDConnection:
         await self._disconnect()
         await self._connect(timeout_seconds=timeout_seconds)
 
+    async def _acquire_in_flight(self) -> None:
+        # Semaphore.acquire always yields to the event loop, so it is only
+        # awaited when the limit was actually reached.
+        try:
+            self._in_flight.acquire_nowait()
+        except WouldBlock:
+            await self._in_flight.acquire()
+
     async def run_command(self, command: str) -> List[str]:
         """Run a command on the MPD server."""
-        if self.connection is None:
-            raise ConnectionFailedError()
+        await self._acquire_in_flight()
 
-        p: Future[RawCommandResult] = Future()
-        await self.pending_commands.send(p)
+        try:
+            # Creating the write fails right away when not connected, before
+            # a reply is expected for it.
+            write = self._write_line(command)
 
-        await self.connection.write_line(command)
+            if not self._pending and not self._reading:
+                return await self._read_inline(write)
 
-        result = await p.get()
+            p = self._future_pool.pop() if self._future_pool else Future()
+            await self._write_enqueued(write, p)
+
+            result = await p.get()
+        finally:
+            self._in_flight.release()
+
+        # Only futures that were waited to completion can be reused: a
+        # cancelled caller leaves its future to be set by the reply loop.
+        p.reset()
+        self._future_pool.append(p)
 
         return result
 
+    async def _read_inline(self, write: Awaitable[None]) -> RawCommandResult:
+        # No other reply is awaited, so the next reply is this command's and
+        # can be read right here, without a Future or a wakeup of the reply
+        # loop.
+        self._reading = True
+
+        try:
+            # Sends cannot be cancelled, so the write either completes or
+            # fails and drops the line. Only a command that reached MPD gets
+            # a reply to make room for.
+            await write
+
+            try:
+                return await self._read_response(self._timeout_seconds)
+            except get_cancelled_exc_class():
+                # The reply still has to be read before any later one, so it
+                # is left to the reply loop, to be discarded.
+                self._pending.appendleft(Future())
+                raise
+        finally:
+            self._reading = False
+
+            if self._pending:
+                # Commands sent meanwhile wait for the reply loop.
+                self._has_pending.set()
+
+    async def run_commands(self, commands: List[str]) -> List[RawCommandResult]:
+        """Run many commands on the MPD server as a single command list.
+
+        The whole list is sent at once and answered in a single round-trip.
+        If any command fails, the error is raised and the commands after it
+        are not run by MPD.
+
+        Args:
+            commands: The commands to run, in order.
+
+        Returns:
+            The raw result of each command, in the same order.
+        """
+        await self._acquire_in_flight()
+
+        try:
+            write = self._write_line(
+                '\n'.join(['command_list_ok_begin', *commands, 'command_list_end'])
+            )
+
+            futures: List[Future[RawCommandResult]] = [Future() for _ in commands]
+            await self._write_enqueued(write, PendingCommandList(futures))
+
+            return [await f.get() for f in futures]
+        finally:
+            self._in_flight.release()
+
+    def _queue_line(self, line: str) -> Awaitable[None]:
+        # Lines are added to the write buffer right away, and the returned
+        # flush sends them. Commands written by other tasks while a send is in
+        # progress go out together in the next send.
+        self._write_buffer += line.encode()
+        self._write_buffer += b'\n'
+        return self._flush()
+
+    async def _flush(self) -> None:
+        if self._flushing:
+            # The task already flushing sends this data as well.
+            return
+
+        # Sends are shielded: a send cancelled halfway may have written any
+        # part of its data, and the buffer holds lines of other tasks as well,
+        # which nobody else would flush. Cancellation reaches the flushing
+        # task once the buffer is empty.
+        self._flushing = True
+        try:
+            while self._write_buffer:
+                data = bytes(self._write_buffer)
+                try:
+                    with CancelScope(shield=True):
+                        await self._write(data)
+                except BaseException:
+                    # Part of the data may be on the wire already, so it
+                    # cannot be sent again.
+                    self._write_buffer.clear()
+                    raise
+                del self._write_buffer[: len(data)]
+        finally:
+            self._flushing = False
+
+    def _enqueue(self, pending: PendingReply) -> None:
+        self._pending.append(pending)
+        self._has_pending.set()
+
+    async def _write_enqueued(
+        self, write: Awaitable[None], pending: PendingReply
+    ) -> None:
+        # The reply is expected before the write is awaited, since other
+        # commands may be written meanwhile and replies come in the order the
+        # lines were sent. A failed write drops the line, so its reply is not
+        # expected anymore.
+        self._enqueue(pending)
+
+        try:
+            await write
+        except BaseException:
+            if pending in self._pending:
+                self._pending.remove(pending)
+            raise
+
+    async def _next_pending(self) -> PendingReply:
+        while not self._pending or self._reading:
+            await self._has_pending.wait()
+            self._has_pending = Event()
+
+        return self._pending.popleft()
+
     async def _read_response(
         self, timeout_seconds: Optional[float]
     ) -> RawCommandResult:
-        if self.connection is None:
-            raise ConnectionFailedError()
-
-        lines: RawCommandResult = []
+        # The buffer always begins with the newline that ended the previous
+        # response, so the terminator can be found even if it is the first
+        # line. Once it has arrived, the whole response is decoded and split
+        # into lines at once.
+        buffer = self._buffer
+        read_available = self._read_available
+        start = 0
 
         while True:
-            line = await self.connection.read_line(timeout_seconds=timeout_seconds)
+            end = find_terminator(buffer, start)
+
+            if end >= 0:
+                line_end = buffer.find(b'\n', end + 1)
+                if line_end >= 0:
+                    break
+                start = end
+            else:
+                start = max(0, len(buffer) - LONGEST_TERMINATOR + 1)
 
-            if line.startswith('OK'):
-                break
-            if line.startswith('ACK'):
-                raise parse_error(line, lines)
+            buffer += await read_available(timeout_seconds=timeout_seconds)
 
-            lines.append(line)
+        lines = buffer[1:end].decode().split('\n') if end > 0 else []
+        terminator = buffer[end + 1 : line_end]
+        del buffer[:line_end]
+
+        if terminator[:3] == b'ACK':
+            raise parse_error(terminator.decode(), lines)
 
         return lines
 
     def _start_loop(self, timeout_seconds: Optional[float]) -> None:
+        assert self.connection is not None
+        self._write_line = self._queue_line
+        self._read_available = self.connection.read_available
+        self._write = self.connection.write
+        self._write_buffer = bytearray()
+        self._flushing = False
+        self._reading = False
+        self._timeout_seconds = timeout_seconds
+        self._pending = deque()
+        self._has_pending = Event()
+        self._buffer = bytearray(b'\n')
         self.task_group.start_soon(self._reply_loop, timeout_seconds)
 
+    async def _read_command_list_response(
+        self, pending: PendingCommandList, timeout_seconds: Optional[float]
+    ) -> None:
+        # Every reply is read before any future is fulfilled, so the caller is
+        # woken up once for the whole list instead of once per command.
+        replies: List[RawCommandResult] = []
+
+        try:
+            for _ in pending.futures:
+                replies.append(await self._read_response(timeout_seconds))
+            await self._read_response(timeout_seconds)
+        except Exception as e:  # pylint: disable=broad-except
+            # MPD stops at the first error, so the commands after it never run
+            # and fail with the same error. If only the final OK is missing,
+            # every command already has its reply and a broken connection will
+            # surface on the next command.
+            for f in pending.futures[len(replies) :]:
+                f.fail(e)
+
+        for f, reply in zip(pending.futures, replies):
+            f.set(reply)
+
     async def _reply_loop(self, timeout_seconds: Optional[float]) -> None:
         while True:
-            pending = await self.pending_commands.receive()
-            try:
-                reply = await self._read_response(timeout_seconds)
-            except Exception as e:  # pylint: disable=broad-except
-                pending.fail(e)
-            else:
-                pending.set(reply)
-
+            pending = await self._next_pending()
+            self._reading = True
 
-@dataclass
+            try:
+                await self._handle_pending(pending, timeout_seconds)
+            finally:
+                self._reading = False
+
+    async def _handle_pending(
+        self, pending: PendingReply, timeout_seconds: Optional[float]
+    ) -> None:
+        if isinstance(pending, PendingCommandList):
+            await self._read_command_list_response(pending, timeout_seconds)
+            return
+
+        try:
+            reply = await self._read_response(timeout_seconds)
+        except Exception as e:  # pylint: disable=broad-except
+            pending.fail(e)
+        else:
+            pending.set(reply)
+
+
+@dataclass(**DATACLASS_SLOTS)
 class BaseMPDClient:
     """Base class for MPD clients."""
 
     connection: Optional[MPDConnection] = None
     timeout_seconds: Optional[float] = 1.0
+    socket_options: SocketOptions = SocketOptions()
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    # Bound to the connection's run_command while connected, so running a
+    # command skips checking for a connection and one level of forwarding.
+    _run_command: Callable[[str], Awaitable[List[str]]] = field(
+        default_factory=lambda: not_connected, init=False, repr=False
+    )
 
     @classmethod
     @asynccontextmanager
@@ -145,24 +640,29 @@ class BaseMPDClient:
 
     async def connect(self, address: str, port: int, tg: TaskGroup):
         """Connect to the MPD client using TCP."""
-        self.connection = MPDConnection(tg)
-
-        await self.connection.connect(
-            partial(Socket.connect_tcp, address, port),
-            timeout_seconds=self.timeout_seconds,
-        )
+        await self.connect_with(TCPConnector(address, port, self.socket_options), tg)
 
     async def connect_unix(self, path: Path, tg: TaskGroup):
         """Connect to the MPD client using Unix socket."""
-        self.connection = MPDConnection(tg)
+        await self.connect_with(UnixConnector(path, self.socket_options), tg)
+
+    async def connect_with(self, connector: Connector, tg: TaskGroup):
+        """Connect to the MPD client through any connector.
+
+        Args:
+            connector: Creates the socket to the MPD server.
+            tg: The task group that runs the connection's reply loop. It is
+                cancelled when the client disconnects.
+        """
+        self.connection = MPDConnection(tg, max_in_flight=self.max_in_flight)
 
-        await self.connection.connect(
-            partial(Socket.connect_unix, path),
-            timeout_seconds=self.timeout_seconds,
-        )
+        await self.connection.connect(connector, timeout_seconds=self.timeout_seconds)
+        self._run_command = self.connection.run_command
 
     async def disconnect(self):
         """Disconnect from the MPD server."""
+        self._run_command = not_connected
+
         if self.connection is not None:
             await self.connection.disconnect()
 
@@ -178,7 +678,54 @@ class BaseMPDClient:
 
     async def run_command(self, command: str) -> List[str]:
         """Run a command on the MPD server."""
+        return await self._run_command(command)
+
+    async def run_commands(self, commands: List[str]) -> List[List[str]]:
+        """Run many commands on the MPD server as a single command list."""
         if self.connection is None:
             raise ConnectionFailedError('Connection is not established.')
 
-        return await self.connection.run_command(command)
+        return await self.connection.run_commands(commands)
+
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator[CommandPipeline]:
+        """Collect commands and run them as one command list when leaving.
+
+        Example:
+            async with client.pipeline() as p:
+                p.add('status')
+                p.add('stats')
+            status_lines, stats_lines = p.results
+
+        Nothing is sent if the block raises or no command was added.
+        """
+        pipeline = CommandPipeline()
+        yield pipeline
+
+        if pipeline.commands:
+            pipeline.results = await self.run_commands(pipeline.commands)
+
+    @asynccontextmanager
+    async def batch(self) -> AsyncIterator[CommandBatch]:
+        """Collect client method calls and run them as one command list.
+
+        Unlike pipeline(), results are parsed by the methods themselves.
+
+        Example:
+            async with client.batch() as b:
+                status = b.add(client.status())
+                song = b.add(client.current_song())
+            print(await status.get(), await song.get())
+
+        Calls are run when leaving the block, or earlier with `b.execute()`.
+        If the block raises, the calls not yet run are dropped.
+        """
+        batch = CommandBatch(self)
+
+        try:
+            yield batch
+        except BaseException:
+            batch.discard()
+            raise
+
+        await batch.execute()
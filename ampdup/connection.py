@@ -1,33 +1,95 @@
 """Module for connection-related functionality."""
+import socket
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Awaitable, Callable, Optional, Union
 
-from anyio import IncompleteRead, connect_tcp, connect_unix, move_on_after
-from anyio.abc import SocketStream
-from anyio.streams.buffered import BufferedByteReceiveStream
+from anyio import EndOfStream, connect_tcp, connect_unix, move_on_after
+from anyio.abc import SocketAttribute, SocketStream
 from typing_extensions import Protocol
 
 from .errors import ConnectionFailedError, ReceiveError
+from .util import DATACLASS_SLOTS
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
+class SocketOptions:
+    """Options applied to the operating system socket when connecting.
+
+    Members:
+        receive_buffer_size: The size of the kernel receive buffer
+                             (SO_RCVBUF) in bytes. A larger buffer lets big
+                             responses arrive while they are being parsed.
+                             If None, the system default and its automatic
+                             tuning are kept.
+        send_buffer_size: The size of the kernel send buffer (SO_SNDBUF) in
+                          bytes. If None, the system default is kept.
+        keepalive: Whether TCP connections send keepalive probes
+                   (SO_KEEPALIVE), so a server that went away is noticed
+                   even while the client is idle.
+        keepalive_idle_seconds: How long a TCP connection must be idle before
+                                probes are sent (TCP_KEEPIDLE, where the
+                                platform supports it). If None, the system
+                                default, usually two hours, is kept.
+    """
+
+    receive_buffer_size: Optional[int] = None
+    send_buffer_size: Optional[int] = None
+    keepalive: bool = True
+    keepalive_idle_seconds: Optional[int] = None
+
+    def apply(self, sock: SocketStream):
+        """Apply the options to the socket under a socket stream."""
+        raw_socket = sock.extra(SocketAttribute.raw_socket)
+
+        if self.receive_buffer_size is not None:
+            raw_socket.setsockopt(
+                socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer_size
+            )
+        if self.send_buffer_size is not None:
+            raw_socket.setsockopt(
+                socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size
+            )
+
+    def apply_tcp(self, sock: SocketStream):
+        """Apply the options that only concern TCP sockets."""
+        raw_socket = sock.extra(SocketAttribute.raw_socket)
+
+        if not self.keepalive:
+            return
+
+        raw_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        if self.keepalive_idle_seconds is not None and hasattr(socket, 'TCP_KEEPIDLE'):
+            raw_socket.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keepalive_idle_seconds
+            )
+
+
+@dataclass(**DATACLASS_SLOTS)
 class Socket:
     """An async socket higher-level abstraction.
 
-    This abstraction adds the read_line method using a companion buffered stream,
+    This abstraction adds the read_line method using its own receive buffer,
     and abstracts the usage of Unix sockets or TCP sockets.
     """
 
     sock: SocketStream
-    buffered: BufferedByteReceiveStream = field(init=False)
+    _buffer: bytearray = field(init=False, default_factory=bytearray)
+    # Where to resume looking for a newline, since the buffer before this
+    # position is known to have none.
+    _scan_position: int = field(init=False, default=0)
+    # The stream's methods, bound once instead of looked up on every call.
+    _send: Callable[[bytes], Awaitable[None]] = field(init=False, repr=False)
+    _receive: Callable[[], Awaitable[bytes]] = field(init=False, repr=False)
 
     def __post_init__(self):
-        self.buffered = BufferedByteReceiveStream(self.sock)
+        self._send = self.sock.send
+        self._receive = self.sock.receive
 
     async def write(self, data: bytes):
         """Write data to the socket."""
-        await self.sock.send(data)
+        await self._send(data)
 
     async def read_line(self, *, timeout_seconds: Optional[float] = 1) -> bytes:
         """Read from the socket up to a newline.
@@ -36,12 +98,47 @@ class Socket:
             timeout_seconds: How many seconds to wait before timing out the read
                              operation.
         """
-        try:
-            with move_on_after(timeout_seconds):
-                return await self.buffered.receive_until(b'\n', 0xFFFFFFFF)
-            raise ReceiveError('Connection timed out during readline.')
-        except IncompleteRead as e:
-            raise ReceiveError('Connection closed before a newline was sent.') from e
+        buffer = self._buffer
+
+        with move_on_after(timeout_seconds):
+            while True:
+                end = buffer.find(b'\n', self._scan_position)
+
+                if end >= 0:
+                    line = bytes(buffer[:end])
+                    del buffer[: end + 1]
+                    self._scan_position = 0
+                    return line
+
+                self._scan_position = len(buffer)
+
+                try:
+                    buffer += await self._receive()
+                except EndOfStream as e:
+                    raise ReceiveError('Connection closed by the server.') from e
+
+        raise ReceiveError('Connection timed out during readline.')
+
+    async def read_available(self, *, timeout_seconds: Optional[float] = 1) -> bytes:
+        """Read whatever data is available, waiting for some if there is none.
+
+        Args:
+            timeout_seconds: How many seconds to wait before timing out the read
+                             operation.
+        """
+        if self._buffer:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            self._scan_position = 0
+            return data
+
+        with move_on_after(timeout_seconds):
+            try:
+                return await self._receive()
+            except EndOfStream as e:
+                raise ReceiveError('Connection closed by the server.') from e
+
+        raise ReceiveError('Connection timed out during read.')
 
     async def aclose(self):
         """Close the socket."""
@@ -54,14 +151,29 @@ class Socket:
         await self.aclose()
 
     @staticmethod
-    async def connect_tcp(address: str, port: int) -> 'Socket':
-        """Create a socket with a TCP socket stream."""
-        return Socket(await connect_tcp(address, port))
+    async def connect_tcp(
+        address: str, port: int, options: SocketOptions = SocketOptions()
+    ) -> 'Socket':
+        """Create a socket with a TCP socket stream.
+
+        Nagle's algorithm is disabled, since commands are small writes that
+        are always followed by waiting for a reply.
+        """
+        sock = await connect_tcp(address, port)
+        raw_socket = sock.extra(SocketAttribute.raw_socket)
+        raw_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        options.apply(sock)
+        options.apply_tcp(sock)
+        return Socket(sock)
 
     @staticmethod
-    async def connect_unix(path: Path) -> 'Socket':  # pragma: is-windows
+    async def connect_unix(  # pragma: is-windows
+        path: Path, options: SocketOptions = SocketOptions()
+    ) -> 'Socket':
         """Create a socket with a Unix-socket stream."""
-        return Socket(await connect_unix(path))
+        sock = await connect_unix(path)
+        options.apply(sock)
+        return Socket(sock)
 
 
 class Connector(Protocol):
@@ -71,7 +183,56 @@ class Connector(Protocol):
         ...
 
 
-@dataclass
+@dataclass(frozen=True, **DATACLASS_SLOTS)
+class TCPConnector:
+    """A Connector for MPD servers listening on TCP."""
+
+    address: str
+    port: int
+    options: SocketOptions = SocketOptions()
+
+    async def __call__(self) -> Socket:
+        return await Socket.connect_tcp(self.address, self.port, self.options)
+
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
+class UnixConnector:
+    """A Connector for MPD servers listening on a Unix socket."""
+
+    path: Path
+    options: SocketOptions = SocketOptions()
+
+    async def __call__(self) -> Socket:  # pragma: is-windows
+        return await Socket.connect_unix(self.path, self.options)
+
+
+class DisconnectedSocket:
+    """Stand-in for the Socket of a Connection that is not established.
+
+    Every I/O operation fails, so Connection can forward calls to its socket
+    without checking whether there is one.
+    """
+
+    async def write(self, _data: bytes):
+        """Fail, since there is no connection to write to."""
+        raise ConnectionFailedError('Not connected.')
+
+    async def read_line(self, *, timeout_seconds: Optional[float] = 1) -> bytes:
+        """Fail, since there is no connection to read from."""
+        raise ConnectionFailedError('Not connected.')
+
+    async def read_available(self, *, timeout_seconds: Optional[float] = 1) -> bytes:
+        """Fail, since there is no connection to read from."""
+        raise ConnectionFailedError('Not connected.')
+
+    async def aclose(self):
+        """Do nothing, since there is nothing to close."""
+
+
+DISCONNECTED = DisconnectedSocket()
+
+
+@dataclass(**DATACLASS_SLOTS)
 class Connection:
     """Abstraction for a connection to MPD.
 
@@ -80,34 +241,39 @@ class Connection:
     """
 
     connector: Connector
-    socket: Optional[Socket] = field(init=False, default=None)
+    socket: Union[Socket, DisconnectedSocket] = field(init=False, default=DISCONNECTED)
 
     async def connect(self):
         """Connect to the MPD server."""
         self.socket = await self.connector()
-        result = await self.read_line()
+        banner = await self.socket.read_line()
+
+        if banner[:6] != b'OK MPD':
+            # Only decoded here, to say what was received instead.
+            received = banner.decode(errors='replace')
+            raise ConnectionFailedError(f'Got wrong response from MPD: {received!r}.')
 
-        if not result.startswith('OK MPD'):
-            raise ConnectionFailedError('Got wrong response from MPD.')
+    async def write(self, data: bytes):
+        """Send data through the connection."""
+        await self.socket.write(data)
 
     async def write_line(self, command: str):
         """Send a line through the connection."""
-        if self.socket is not None:
-            await self.socket.write(command.encode() + b'\n')
-            return
-        raise ConnectionFailedError('Not connected.')
+        await self.socket.write(command.encode() + b'\n')
 
     async def read_line(self, *, timeout_seconds: Optional[float] = 1) -> str:
         """Read a line from the connection."""
-        if self.socket is not None:
-            line = await self.socket.read_line(timeout_seconds=timeout_seconds)
-            return line.decode().strip('\n')
-        raise ConnectionFailedError('Not connected.')
+        # The socket already leaves the newline out.
+        line = await self.socket.read_line(timeout_seconds=timeout_seconds)
+        return line.decode()
+
+    async def read_available(self, *, timeout_seconds: Optional[float] = 1) -> bytes:
+        """Read whatever data is available from the connection."""
+        return await self.socket.read_available(timeout_seconds=timeout_seconds)
 
     async def aclose(self):
         """Close the connection."""
-        if self.socket is not None:
-            await self.socket.aclose()
+        await self.socket.aclose()
 
     async def __aenter__(self) -> 'Connection':
         await self.connect()
@@ -1,6 +1,7 @@
 """Classes for raising when errors happen."""
 from dataclasses import dataclass
 from enum import Enum
+from functools import partial
 from typing import Callable, Dict, List
 
 __all__ = [
@@ -74,8 +75,12 @@ class CommandError(MPDError):
     partial: List[str]
 
     def __post_init__(self):
+        # The message is only formatted if the error is ever shown.
+        super().__init__()
+
+    def __str__(self) -> str:
         codetext = f'{self.code.name}/{self.code.value}'
-        super().__init__(f'[{codetext}@{self.line}] {{{self.command}}} {self.message}')
+        return f'[{codetext}@{self.line}] {{{self.command}}} {self.message}'
 
 
 class URINotFoundError(CommandError):
@@ -92,6 +97,12 @@ ERRORS: Dict[ErrorCode, ErrorFactory] = {
     ErrorCode.NO_EXIST: URINotFoundError,
 }
 
+# Every error code mapped to its constructor, computed once so that parsing
+# an error does not create a new factory function each time.
+ERROR_CONSTRUCTORS: Dict[ErrorCode, ErrorFactory] = {
+    code: ERRORS.get(code) or partial(CommandError, code) for code in ErrorCode
+}
+
 
 def get_error_constructor(error_code: ErrorCode) -> ErrorFactory:
     """Get the error constructor for an error code, or a generic one.
@@ -106,4 +117,4 @@ def get_error_constructor(error_code: ErrorCode) -> ErrorFactory:
         A function that constructs the correct exception with the remaining
         arguments.
     """
-    return ERRORS.get(error_code) or (lambda *args: CommandError(error_code, *args))
+    return ERROR_CONSTRUCTORS[error_code]
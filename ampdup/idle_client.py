@@ -1,15 +1,35 @@
 """Idle client module."""
 from dataclasses import dataclass, field
-from typing import List, Optional
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Tuple
 
 from .base_client import BaseMPDClient
 from .errors import ClientTypeError
-from .parsing import split_item
 from .types import Subsystem
-from .util import has_any_prefix
+from .util import DATACLASS_SLOTS, IDLE_COMMANDS, command_name
 
+NOIDLE = b'noidle\n'
 
-@dataclass
+# Looking a name up here skips the machinery behind calling the Enum.
+SUBSYSTEMS_BY_NAME = {s.value: s for s in Subsystem}
+
+
+@lru_cache()
+def idle_command(subsystems: Tuple[Subsystem, ...]) -> str:
+    """Make the idle command for a set of subsystems.
+
+    Idle loops keep asking for the same subsystems, so the commands are cached.
+
+    Args:
+        subsystems: The subsystems to listen to, or none to listen to all.
+
+    Returns:
+        The idle command.
+    """
+    return ' '.join(['idle', *(s.value for s in subsystems)])
+
+
+@dataclass(**DATACLASS_SLOTS)
 class IdleMPDClient(BaseMPDClient):
     """Client that is only capable of running the idle command.
 
@@ -19,12 +39,15 @@ class IdleMPDClient(BaseMPDClient):
     timeout_seconds: Optional[float] = field(init=False, default=None)
 
     async def run_command(self, command: str):
-        if not has_any_prefix(command, ('idle', 'noidle')):
+        if command_name(command) not in IDLE_COMMANDS:
             raise ClientTypeError(
                 'Use an MPDClient to run commands other than idle and noidle.'
             )
 
-        return await super().run_command(command)
+        return await self._run_command(command)
+
+    async def run_commands(self, commands: List[str]):
+        raise ClientTypeError('Use an MPDClient to run command lists.')
 
     async def idle(self, *subsystems: Subsystem) -> List[Subsystem]:
         """Run the idle command, fetching events from the player.
@@ -38,13 +61,32 @@ class IdleMPDClient(BaseMPDClient):
             List[Subsystem]: subsystems that changed since the command was
                              called.
         """
-        subsystem_names = [s.value for s in subsystems]
-        command = ' '.join(['idle', *subsystem_names])
+        # Every line is 'changed: <subsystem>'.
+        lines = await self.run_command(idle_command(subsystems))
 
-        changed = (split_item(i) for i in await self.run_command(command))
+        try:
+            return [SUBSYSTEMS_BY_NAME[line.partition(': ')[2]] for line in lines]
+        except KeyError as e:
+            raise ValueError(f'{e.args[0]!r} is not a valid Subsystem') from e
 
-        return [Subsystem(s) for _, s in changed]
+    async def watch(self, *subsystems: Subsystem) -> AsyncIterator[List[Subsystem]]:
+        """Wait for changes forever, running idle again after each one.
+
+        Example:
+            async for changed in i.watch(Subsystem.PLAYER):
+                status = await m.status()
+
+        Args:
+            *subsystems (Subsystem):
+                Subsystems to listen to (variadic). If empty or omitted listens
+                to all systems.
+
+        Yields:
+            List[Subsystem]: subsystems that changed, once per idle call.
+        """
+        while True:
+            yield await self.idle(*subsystems)
 
     async def noidle(self):
         """Cancel the current idle command."""
-        return await self.connection.connection.write_line('noidle')
+        return await self.connection.connection.write(NOIDLE)
@@ -4,8 +4,18 @@ from typing import List, Optional, Tuple, Union
 from .base_client import BaseMPDClient
 from .errors import ClientTypeError, NoCurrentSongError
 from .parsing import from_lines, parse_playlist, parse_single
-from .types import SearchType, Single, Song, SongId, Stats, Status, Tag, TimeRange
-from .util import has_any_prefix
+from .types import (
+    SearchType,
+    Single,
+    Snapshot,
+    Song,
+    SongId,
+    Stats,
+    Status,
+    Tag,
+    TimeRange,
+)
+from .util import IDLE_COMMANDS, command_name
 
 Range = Tuple[int, int]
 PositionOrRange = Union[int, Range]
@@ -13,6 +23,28 @@ PositionOrRange = Union[int, Range]
 
 AnySearchType = Union[Tag, SearchType]
 
+# Arguments for the positions used most often, formatted once.
+SMALL_POSITION_ARGS = [f' {i}' for i in range(256)]
+
+# Tag is a closed set, so commands taking one start with a few fixed prefixes,
+# computed once here instead of formatted on every call.
+PLAYLIST_FIND_PREFIXES = {t: f'playlistfind {t} ' for t in Tag}
+PLAYLIST_SEARCH_PREFIXES = {t: f'playlistsearch {t} ' for t in Tag}
+
+QUOTE_TABLE = str.maketrans({'"': '\\"', '\\': '\\\\'})
+
+
+def quote(arg: str) -> str:
+    """Quote a string argument, escaping the quotes and backslashes in it.
+
+    Args:
+        arg: The argument, as it should be received by MPD.
+
+    Returns:
+        The argument in double quotes, ready to be sent in a command.
+    """
+    return '"' + arg.translate(QUOTE_TABLE) + '"'
+
 
 def position_or_range_arg(arg: Optional[PositionOrRange]) -> str:
     """Make argument string for commands that may take a position or a range.
@@ -26,11 +58,26 @@ def position_or_range_arg(arg: Optional[PositionOrRange]) -> str:
     if arg is None:
         return ''
     if isinstance(arg, int):
-        return f' {arg}'
+        return SMALL_POSITION_ARGS[arg] if 0 <= arg < 256 else f' {arg}'
     start, end = arg
     return f' {start}:{end}'
 
 
+def time_range_arg(time_range: TimeRange) -> str:
+    """Make argument string for a time range, leaving out open ends.
+
+    Args:
+        time_range: A pair of offsets in seconds, either of which may be None.
+
+    Returns:
+        The range in start:end format, with an empty side for each None.
+    """
+    start, end = time_range
+    if start is None:
+        return ':' if end is None else f':{end}'
+    return f'{start}:' if end is None else f'{start}:{end}'
+
+
 def find_args(queries: List[Tuple[AnySearchType, str]]) -> str:
     """Make argument string for find and search.
 
@@ -40,17 +87,25 @@ def find_args(queries: List[Tuple[AnySearchType, str]]) -> str:
     Returns:
         An argument string.
     """
-    return ' '.join(f'{type.value} "{what}"' for type, what in queries)
+    return ' '.join([f'{type} {quote(what)}' for type, what in queries])
 
 
 class MPDClient(BaseMPDClient):
     """An async MPD Client object for any operations except idle/noidle."""
 
+    __slots__ = ()
+
     async def run_command(self, command: str) -> List[str]:
-        if has_any_prefix(command, ('idle', 'noidle')):
+        if command_name(command) in IDLE_COMMANDS:
+            raise ClientTypeError('Use an IdleClient to use the idle command.')
+
+        return await self._run_command(command)
+
+    async def run_commands(self, commands: List[str]) -> List[List[str]]:
+        if any(command_name(c) in IDLE_COMMANDS for c in commands):
             raise ClientTypeError('Use an IdleClient to use the idle command.')
 
-        return await super().run_command(command)
+        return await super().run_commands(commands)
 
     # MPD status
 
@@ -85,6 +140,27 @@ class MPDClient(BaseMPDClient):
         result = await self.run_command('stats')
         return from_lines(Stats, result)
 
+    async def snapshot(self) -> Snapshot:
+        """Get the player status, the current song and the stats at once.
+
+        The three commands are sent as a single command list, so polling all
+        of them costs one round-trip instead of three.
+
+        Returns:
+            The status, the current song (None if there is none) and the stats.
+        """
+        async with self.batch() as b:
+            status = b.add(self.status())
+            song = b.add(self.current_song())
+            stats = b.add(self.stats())
+
+        try:
+            current_song: Optional[Song] = await song.get()
+        except NoCurrentSongError:
+            current_song = None
+
+        return Snapshot(await status.get(), current_song, await stats.get())
+
     # Playback options
 
     async def consume(self, state: bool):
@@ -151,8 +227,7 @@ class MPDClient(BaseMPDClient):
                  If omitted and playback is paused, resume it.
                  If playback was stopped, start from the beginning.
         """
-        arg = '' if pos is None else f' {pos}'
-        await self.run_command(f'play{arg}')
+        await self.run_command('play' if pos is None else f'play {pos}')
 
     async def play_id(self, song_id: Optional[SongId] = None):
         """Begin playback. If supplied, start at the song with id `song_id`.
@@ -162,8 +237,7 @@ class MPDClient(BaseMPDClient):
                      playback. If omitted and playback is paused, resume it.
                      If playback was stopped, start from the beginning.
         """
-        arg = '' if song_id is None else f' {song_id}'
-        await self.run_command(f'playid{arg}')
+        await self.run_command('playid' if song_id is None else f'playid {song_id}')
 
     async def previous(self):
         """Play previous song in the playlist."""
@@ -217,7 +291,7 @@ class MPDClient(BaseMPDClient):
         Args:
             uri: The URI of what to add. Directories are added recursively.
         """
-        await self.run_command(f'add "{uri}"')
+        await self.run_command('add ' + quote(uri))
 
     async def add_id(self, song_uri: str, position: int = None) -> SongId:
         """Add a directory or a file to the current playlist.
@@ -232,7 +306,7 @@ class MPDClient(BaseMPDClient):
         """
         pos = '' if position is None else f' {position}'
 
-        result = await self.run_command(f'addid "{song_uri}"{pos}')
+        result = await self.run_command(f'addid {quote(song_uri)}{pos}')
         return parse_single(result, SongId)
 
     async def clear(self):
@@ -295,7 +369,7 @@ class MPDClient(BaseMPDClient):
 
         Returns:
         """
-        result = await self.run_command(f'playlistfind {tag.value} "{needle}"')
+        result = await self.run_command(PLAYLIST_FIND_PREFIXES[tag] + quote(needle))
         return parse_playlist(result)
 
     async def playlist_id(self, song_id: Optional[SongId] = None) -> List[Song]:
@@ -341,7 +415,7 @@ class MPDClient(BaseMPDClient):
 
         Returns:
         """
-        result = await self.run_command(f'playlistsearch {tag.value} "{needle}"')
+        result = await self.run_command(PLAYLIST_SEARCH_PREFIXES[tag] + quote(needle))
         return parse_playlist(result)
 
     async def prio(self, priority: int, song_range: Range):
@@ -379,10 +453,7 @@ class MPDClient(BaseMPDClient):
             time_range: A pair of offsets in seconds (fractions allowed).
                         If omitted, removes any range,
         """
-        start, end = time_range
-        start_arg = '' if start is None else f'{start}'
-        end_arg = '' if end is None else f'{end}'
-        await self.run_command(f'rangeid {song_id} {start_arg}:{end_arg}')
+        await self.run_command(f'rangeid {song_id} {time_range_arg(time_range)}')
 
     async def shuffle(self, shuffle_range: Optional[Range] = None):
         """Shuffle the current playlist.
@@ -423,8 +494,9 @@ class MPDClient(BaseMPDClient):
     ) -> List[str]:
         descending_text = '-' if descending else ''
 
-        sort_text = f' sort {descending_text}{sort.value}' if sort is not None else ''
+        sort_text = f' sort {descending_text}{sort}' if sort is not None else ''
 
+        # Filter expressions carry their own escaping, so they are sent as is.
         result = await self.run_command(f'{command} "{filter_expression}"{sort_text}')
 
         return result
@@ -488,7 +560,7 @@ class MPDClient(BaseMPDClient):
         Returns:
             The id of the update job.
         """
-        arg = f' "{uri}"' if uri else ''
+        arg = ' ' + quote(uri) if uri else ''
 
         result = await self.run_command(f'update{arg}')
         return parse_single(result, int)
@@ -503,7 +575,7 @@ class MPDClient(BaseMPDClient):
         Returns:
             The id of the update job.
         """
-        arg = f' "{uri}"' if uri else ''
+        arg = ' ' + quote(uri) if uri else ''
 
         result = await self.run_command(f'rescan{arg}')
         return parse_single(result, int)
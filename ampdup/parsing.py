@@ -1,10 +1,20 @@
 """MPD output parsing utilities."""
-import re
-from typing import Callable, Iterable, List, Tuple, Type, TypeVar, Union, overload
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    overload,
+)
 
 from .errors import CommandError, ErrorCode, get_error_constructor
 from .types import Song
-from .util import from_json_like, split_on
+from .util import converter, from_json_like
 
 __all__ = [
     'normalize',
@@ -23,6 +33,21 @@ class IncompatibleErrorMessage(Exception):
     """Exception in case MPD sends an error in a different format somehow."""
 
 
+class NormalizedNames(Dict[str, str]):
+    """Normalized value names, computed the first time each name is seen.
+
+    MPD only sends names from a small, fixed set, so after the first reply
+    normalizing a name is a single dict lookup.
+    """
+
+    def __missing__(self, name: str) -> str:
+        normalized = self[name] = name.lower().replace('-', '_')
+        return normalized
+
+
+NORMALIZED_NAMES = NormalizedNames()
+
+
 def normalize(name: str) -> str:
     """Normalize a value name to a valid Python (PEP8 compliant) identifier.
 
@@ -32,28 +57,46 @@ def normalize(name: str) -> str:
     Returns:
         The normalized name, in all lowercase with - replaced by _.
     """
-    return name.lower().replace('-', '_')
+    return NORMALIZED_NAMES[name]
 
 
 def split_item(item: str) -> Tuple[str, str]:
     """Split a key/value pair in a string into a tuple (key, value).
 
-    This also strips space from both sides of either.
+    MPD always separates the two with ': ', so they are split there as they
+    are. Items with any other spacing around the colon are stripped instead.
 
     Args:
         item: A key/value string in 'key: value' format.
 
     Returns:
-        The (key, value) tuple, with both sides stripped.
+        The (key, value) tuple.
     """
-    lhs, rhs = item.split(':', maxsplit=1)
+    lhs, separator, rhs = item.partition(': ')
+
+    if separator:
+        return lhs, rhs
+
+    lhs, separator, rhs = item.partition(':')
+
+    if not separator:
+        raise ValueError(f'Not a key/value pair: {item!r}')
+
     return lhs.strip(), rhs.strip()
 
 
 def from_lines(cls: Type[T], lines: Iterable[str]) -> T:
     """Make a `cls` object from a list of lines in MPD output format."""
-    values = (split_item(l) for l in lines)
-    normalized = {normalize(k): v for k, v in values}
+    # split_item and normalize, inlined for the usual 'key: value' lines.
+    names = NORMALIZED_NAMES
+    normalized = {}
+
+    for line in lines:
+        key, separator, value = line.partition(': ')
+        if not separator:
+            key, value = split_item(line)
+        normalized[names[key]] = value
+
     return from_json_like(cls, normalized)
 
 
@@ -70,14 +113,27 @@ def parse_error(error_line: str, partial: List[str]) -> CommandError:
     Returns:
         A CommandError (or subclass) object with the error data.
     """
-    match = ERROR_RE.match(error_line)
-
-    if match is None:
+    # The format is fixed, so it is taken apart with str.index instead of a
+    # regular expression. Each search raises ValueError if its delimiter is
+    # missing.
+    if not error_line.startswith('ACK'):
         raise IncompatibleErrorMessage(error_line)
 
-    code, line, command, message = match.groups()
-    error_code = ErrorCode(int(code))
-    return get_error_constructor(error_code)(int(line), command, message, partial)
+    try:
+        code_start = error_line.index('[', 3) + 1
+        at = error_line.index('@', code_start)
+        line_end = error_line.index(']', at)
+        command_start = error_line.index('{', line_end) + 1
+        command_end = error_line.index('}', command_start)
+        code = int(error_line[code_start:at])
+        line = int(error_line[at + 1 : line_end])
+    except ValueError as e:
+        raise IncompatibleErrorMessage(error_line) from e
+
+    command = error_line[command_start:command_end]
+    message = error_line[command_end + 1 :].strip()
+    error_code = ErrorCode(code)
+    return get_error_constructor(error_code)(line, command, message, partial)
 
 
 @overload
@@ -112,15 +168,26 @@ def parse_single(  # noqa: F811, pylint: disable=function-redefined
     return cast(value)
 
 
-def is_file(line: str) -> bool:
-    """Check if a return line is a song file."""
-    return line.startswith('file:')
-
-
 def parse_playlist(lines: Iterable[str]) -> List[Song]:
     """Parse playlist information into a list of songs."""
-    split = split_on(is_file, lines)
-    return [from_lines(Song, song_info) for song_info in split]
-
-
-ERROR_RE = re.compile(r'ACK\s+\[(\d+)@(\d+)\]\s+\{(.*)\}\s+(.*)')
+    # A single pass over the lines, as in from_lines, starting a new song at
+    # every file line.
+    build = converter(Song)
+    names = NORMALIZED_NAMES
+    songs = []
+    song: Optional[Dict[str, str]] = None
+
+    for line in lines:
+        key, separator, value = line.partition(': ')
+        if not separator:
+            key, value = split_item(line)
+        if key == 'file' or song is None:
+            if song is not None:
+                songs.append(build(song))
+            song = {}
+        song[names[key]] = value
+
+    if song is not None:
+        songs.append(build(song))
+
+    return songs
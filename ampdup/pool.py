@@ -0,0 +1,165 @@
+"""Pool of connected MPD clients."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, List, Tuple
+
+from anyio import CancelScope, Semaphore, create_task_group, current_time
+from anyio.abc import TaskGroup, TaskStatus
+
+from .connection import Connector, SocketOptions, TCPConnector, UnixConnector
+from .errors import CommandError
+from .mpd_client import MPDClient
+from .util import asynccontextmanager
+
+DEFAULT_MAX_SIZE = 4
+DEFAULT_IDLE_THRESHOLD_SECONDS = 30.0
+
+
+@dataclass
+class MPDClientPool:
+    """A pool of connected MPDClients, reused instead of reconnecting.
+
+    Clients are connected on demand, up to max_size at once, and go back to
+    the pool when released, so the connection handshake is paid once per
+    connection instead of once per use.
+
+    Members:
+        task_group: Runs the reply loop of every pooled client.
+        connector: Creates the sockets for new connections.
+        max_size: The maximum number of clients connected at once.
+        idle_threshold_seconds: How long a client may sit in the pool before
+                                it is validated with a ping when borrowed.
+    """
+
+    task_group: TaskGroup
+    connector: Connector
+    max_size: int = DEFAULT_MAX_SIZE
+    idle_threshold_seconds: float = DEFAULT_IDLE_THRESHOLD_SECONDS
+    _idle: List[Tuple[MPDClient, float]] = field(
+        default_factory=list, init=False, repr=False
+    )
+    _available: Semaphore = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._available = Semaphore(self.max_size)
+
+    @classmethod
+    @asynccontextmanager
+    async def make(
+        cls,
+        address: str,
+        port: int,
+        *,
+        max_size: int = DEFAULT_MAX_SIZE,
+        idle_threshold_seconds: float = DEFAULT_IDLE_THRESHOLD_SECONDS,
+        socket_options: SocketOptions = SocketOptions(),
+    ) -> AsyncIterator[MPDClientPool]:
+        """Create a pool of clients connecting through TCP.
+
+        Every client is disconnected when leaving the context.
+        """
+        async with create_task_group() as tg:
+            connector = TCPConnector(address, port, socket_options)
+            pool = cls(tg, connector, max_size, idle_threshold_seconds)
+            try:
+                yield pool
+            finally:
+                await pool.aclose()
+
+    @classmethod
+    @asynccontextmanager
+    async def make_unix(
+        cls,
+        path: Path,
+        *,
+        max_size: int = DEFAULT_MAX_SIZE,
+        idle_threshold_seconds: float = DEFAULT_IDLE_THRESHOLD_SECONDS,
+        socket_options: SocketOptions = SocketOptions(),
+    ) -> AsyncIterator[MPDClientPool]:
+        """Create a pool of clients connecting through a Unix socket.
+
+        Every client is disconnected when leaving the context.
+        """
+        async with create_task_group() as tg:
+            connector = UnixConnector(path, socket_options)
+            pool = cls(tg, connector, max_size, idle_threshold_seconds)
+            try:
+                yield pool
+            finally:
+                await pool.aclose()
+
+    @asynccontextmanager
+    async def client(self) -> AsyncIterator[MPDClient]:
+        """Borrow a connected client, waiting for one if all are in use.
+
+        Example:
+            async with pool.client() as m:
+                await m.play()
+
+        The client goes back to the pool when leaving the context, unless the
+        block raised something other than a CommandError, in which case the
+        state of its connection is unknown and it is disconnected instead.
+
+        A client that sat in the pool for longer than idle_threshold_seconds
+        is pinged before being lent, and replaced if the ping fails.
+        """
+        async with self._available:
+            client = await self._acquire()
+
+            try:
+                yield client
+            except CommandError:
+                self._idle.append((client, current_time()))
+                raise
+            except BaseException:
+                await self._discard(client)
+                raise
+
+            self._idle.append((client, current_time()))
+
+    async def aclose(self) -> None:
+        """Disconnect every client in the pool."""
+        while self._idle:
+            client, _ = self._idle.pop()
+            await client.disconnect()
+
+        self.task_group.cancel_scope.cancel()
+
+    async def _acquire(self) -> MPDClient:
+        if not self._idle:
+            return await self._connect()
+
+        client, released_at = self._idle.pop()
+
+        if current_time() - released_at <= self.idle_threshold_seconds:
+            return client
+
+        try:
+            await client.run_command('ping')
+        except Exception:  # pylint: disable=broad-except
+            await self._discard(client)
+            return await self._connect()
+        except BaseException:
+            # The client is neither lent nor back in the pool.
+            await self._discard(client)
+            raise
+
+        return client
+
+    @staticmethod
+    async def _discard(client: MPDClient) -> None:
+        with CancelScope(shield=True):
+            await client.disconnect()
+
+    async def _connect(self) -> MPDClient:
+        return await self.task_group.start(self._run_client)
+
+    async def _run_client(self, *, task_status: TaskStatus) -> None:
+        # Each client gets a task group of its own, since disconnecting
+        # cancels the task group that runs the client's reply loop.
+        async with create_task_group() as tg:
+            client = MPDClient()
+            await client.connect_with(self.connector, tg)
+            task_status.started(client)
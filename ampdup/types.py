@@ -36,8 +36,13 @@ class Song(NamedTuple):
     grouping: Optional[str] = None
 
 
-class SearchType(Enum):
-    """Special types for searching the database."""
+class SearchType(str, Enum):
+    """Special types for searching the database.
+
+    Like Tag, members are strings that format as their values.
+    """
+
+    __str__ = str.__str__
 
     ANY = 'any'
     FILE = 'file'
@@ -101,6 +106,14 @@ class Stats(NamedTuple):
     db_update: int
 
 
+class Snapshot(NamedTuple):
+    """The player state as commonly polled: status, current song and stats."""
+
+    status: Status
+    song: Optional[Song]
+    stats: Stats
+
+
 class Subsystem(Enum):
     """Enumeration of available subsystems for idle to listen to."""
 
@@ -120,8 +133,14 @@ class Subsystem(Enum):
     MOUNT = 'mount'
 
 
-class Tag(Enum):
-    """Tags supported by MPD."""
+class Tag(str, Enum):
+    """Tags supported by MPD.
+
+    Members are strings, and format as their values, so they can be put in
+    commands directly.
+    """
+
+    __str__ = str.__str__
 
     ARTIST = 'artist'
     ARTISTSORT = 'artistsort'
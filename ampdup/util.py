@@ -1,10 +1,11 @@
 """Utility module."""
+import sys
 from contextlib import asynccontextmanager
 from enum import Enum, EnumMeta
 from functools import lru_cache
 from itertools import groupby
 from operator import itemgetter
-from typing import Any, Callable, Iterable, List, Sequence, Tuple, Type, TypeVar
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Type, TypeVar
 
 from .types import TimeRange
 from .typing_inspect import get_args, is_optional_type
@@ -14,6 +15,13 @@ __all__ = [
 ]
 
 
+# Keyword arguments for @dataclass to generate __slots__ where supported
+# (Python 3.10+). On older versions the classes keep their __dict__.
+DATACLASS_SLOTS: Dict[str, bool] = (
+    {'slots': True} if sys.version_info >= (3, 10) else {}
+)
+
+
 class NoCommonTypeError(Exception):
     """Happens when values in an Enum are not of the same type."""
 
@@ -71,8 +79,7 @@ def from_list(list_type, v) -> List[Any]:
     Returns:
         list_type: An object of type `list_type`.
     """
-    (inner_type,) = list_type.__args__
-    return [from_json_like(inner_type, value) for value in v]
+    return converter(list_type)(v)
 
 
 T = TypeVar('T')
@@ -88,17 +95,7 @@ def from_dict(cls: Type[T], d) -> T:
     Returns:
         cls: An object of type `cls`.
     """
-    # pylint:disable=protected-access
-    if hasattr(cls, '_renames'):
-        for k in d:
-            if k in cls._renames:  # type: ignore
-                d[cls._renames[k]] = d.pop(k)  # type: ignore
-    return cls(
-        **{
-            i: from_json_like(cls.__annotations__[i], v)  # type: ignore
-            for i, v in d.items()
-        }
-    )
+    return converter(cls)(d)  # type: ignore
 
 
 def time_range(s: str) -> TimeRange:
@@ -114,53 +111,109 @@ def time_range(s: str) -> TimeRange:
     return TimeRange((float(start), float(end)))
 
 
-def from_json_like(cls: Type[T], j) -> T:
-    """Make an object from a JSON-like value, recursively, based on type hints.
+def identity(j: T) -> T:
+    """Return a value unchanged."""
+    return j
+
+
+@lru_cache(maxsize=None)
+def converter(cls: Type[T]) -> Callable[[Any], T]:
+    """Make a function that builds `cls` objects from JSON-like values.
+
+    The type hints are inspected once per type, so the function returned only
+    does the conversions. It is cached, as it is needed for every response.
 
     Args:
         cls: The type to instantiate.
-        j: the JSON-like object.
 
     Returns:
-        cls: An object of type `cls`.
+        A function from a JSON-like value to an object of type `cls`.
     """
+    # pylint: disable=too-many-return-statements
     if cls is bool:
-        return cls(int(j))  # type: ignore
+        return lambda j: cls(int(j))  # type: ignore
     if is_optional_type(cls):
-        for t in get_args(cls):
-            if t is type(None):  # noqa
-                continue
-            try:
-                return from_json_like(t, j)
-            except TypeError:
-                continue
-        raise TypeError(f'{j} cannot be converted into {cls}.')
+        options = [converter(t) for t in get_args(cls) if t is not type(None)]
+
+        def convert_optional(j):
+            for convert in options:
+                try:
+                    return convert(j)
+                except TypeError:
+                    continue
+            raise TypeError(f'{j} cannot be converted into {cls}.')
+
+        return convert_optional
     if cls is str:
-        return j
+        return identity  # type: ignore
     if cls is TimeRange:
-        return time_range(j)  # type: ignore
+        return time_range  # type: ignore
     if any(issubclass(cls, t) for t in (int, float)):
-        return cls(j)  # type: ignore
+        return cls
     if issubclass(cls, Enum):
-        return cls(underlying_type(cls)(j))  # type: ignore
+        value_type = underlying_type(cls)  # type: ignore
+        return lambda j: cls(value_type(j))  # type: ignore
     if issubclass(cls, List):
-        return from_list(cls, j)  # type: ignore
+        (inner_type,) = cls.__args__  # type: ignore
+        convert_item = converter(inner_type)
+        return lambda j: [convert_item(v) for v in j]  # type: ignore
     if is_namedtuple(cls):
-        return from_dict(cls, j)
-    raise TypeError(f'{j} cannot be converted into {cls}.')
+        return namedtuple_converter(cls)
+
+    def unsupported(j):
+        raise TypeError(f'{j} cannot be converted into {cls}.')
+
+    return unsupported
+
+
+def namedtuple_converter(cls: Type[T]) -> Callable[[Any], T]:
+    """Make a function that builds a NamedTuple from a dict of its fields.
+
+    Args:
+        cls: The NamedTuple type to instantiate.
+
+    Returns:
+        A function from a dict of field names to values to a `cls` object.
+    """
+    fields: Dict[str, Callable[[Any], Any]] = {
+        name: converter(t) for name, t in cls.__annotations__.items()
+    }
+    renames = getattr(cls, '_renames', None)
+
+    def convert_namedtuple(d):
+        if renames:
+            d = {renames.get(k, k): v for k, v in d.items()}
+        return cls(**{k: fields[k](v) for k, v in d.items()})  # type: ignore
+
+    return convert_namedtuple
+
+
+def from_json_like(cls: Type[T], j) -> T:
+    """Make an object from a JSON-like value, recursively, based on type hints.
+
+    Args:
+        cls: The type to instantiate.
+        j: the JSON-like object.
+
+    Returns:
+        cls: An object of type `cls`.
+    """
+    return converter(cls)(j)  # type: ignore
+
+
+IDLE_COMMANDS = frozenset({'idle', 'noidle'})
 
 
-def has_any_prefix(s: str, prefixes: Sequence[str]) -> bool:
-    """Checks if a string has any of the provided prefixes.
+def command_name(command: str) -> str:
+    """Get the name of a command, without its arguments.
 
     Args:
-        s: The string to check.
-        prefixes: A sequence of prefixes to check.
+        command: A full command line.
 
     Returns:
-        Whether the string matches any of the prefixes.
+        The first word of the command.
     """
-    return any(s.startswith(prefix) for prefix in prefixes)
+    return command.partition(' ')[0]
 
 
 Predicate = Callable[[T], bool]
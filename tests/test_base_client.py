@@ -0,0 +1,446 @@
+"""Tests for the base_client module."""
+from collections import deque
+from dataclasses import dataclass, field
+from inspect import CORO_CLOSED, getcoroutinestate
+from typing import AsyncIterator, Deque, List, Optional
+
+import pytest
+from anyio import (
+    BrokenResourceError,
+    CancelScope,
+    Event,
+    create_task_group,
+    fail_after,
+    move_on_after,
+    sleep,
+    wait_all_tasks_blocked,
+)
+
+from ampdup.base_client import BaseMPDClient, MPDConnection
+from ampdup.errors import (
+    ClientTypeError,
+    ConnectionFailedError,
+    MPDError,
+    URINotFoundError,
+)
+from ampdup.mpd_client import MPDClient
+
+
+@dataclass
+class FakeConnection:
+    """A Connection replacement that replies with predefined lines.
+
+    The replies are split after every OK or ACK line, and each part only
+    becomes readable once the command (or command list) it answers has been
+    written.
+    """
+
+    replies: List[str]
+    chunk_size: int = 7
+    written: List[str] = field(default_factory=list)
+    write_gate: Optional[Event] = None
+    broken: bool = False
+    data: bytes = field(init=False, default=b'')
+    unanswered: Deque[bytes] = field(init=False, default_factory=deque)
+    has_data: Event = field(init=False, default_factory=Event)
+    in_command_list: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        reply = ''
+
+        for line in self.replies:
+            reply += f'{line}\n'
+            if line == 'OK' or line.startswith('ACK'):
+                self.unanswered.append(reply.encode())
+                reply = ''
+
+    async def write(self, data: bytes):
+        """Record written data, after a checkpoint and the gate, if any.
+
+        Fails without recording anything if the connection is broken.
+        """
+        await sleep(0)
+
+        if self.write_gate is not None:
+            await self.write_gate.wait()
+
+        if self.broken:
+            raise BrokenResourceError
+
+        text = data.decode()
+        self.written.append(text)
+
+        for line in text.splitlines():
+            if line.startswith('command_list_') and line.endswith('begin'):
+                self.in_command_list = True
+            elif line == 'command_list_end' or not self.in_command_list:
+                self.in_command_list = False
+                if self.unanswered:
+                    self.data += self.unanswered.popleft()
+
+        self.has_data.set()
+
+    async def read_available(self, *, timeout_seconds=None) -> bytes:
+        """Return the next chunk of the replies to the commands written."""
+        await sleep(0)
+
+        while not self.data:
+            await self.has_data.wait()
+            self.has_data = Event()
+
+        chunk = self.data[: self.chunk_size]
+        self.data = self.data[self.chunk_size :]
+        return chunk
+
+
+@pytest.fixture
+async def make_connection() -> AsyncIterator:
+    """Fixture for creating MPDConnections over fake connections."""
+    async with create_task_group() as tg:
+
+        def make(replies: List[str], chunk_size: int = 7, **kwargs) -> MPDConnection:
+            connection = MPDConnection(tg, **kwargs)
+            connection.connection = FakeConnection(replies, chunk_size)  # type: ignore
+            connection._start_loop(None)  # pylint: disable=protected-access
+            return connection
+
+        yield make
+
+        tg.cancel_scope.cancel()
+
+
+@pytest.mark.anyio
+async def test_run_command(make_connection):
+    """A single command gets its reply lines."""
+    connection = make_connection(['volume: 50', 'OK'])
+
+    assert await connection.run_command('status') == ['volume: 50']
+    assert connection.connection.written == ['status\n']
+
+
+@pytest.mark.anyio
+async def test_run_command_concurrent_writes(make_connection):
+    """Commands written while a send is in progress are sent together."""
+    connection = make_connection(['a: 1', 'OK', 'b: 2', 'OK', 'c: 3', 'OK'])
+    results = {}
+
+    async def run(command: str):
+        results[command] = await connection.run_command(command)
+
+    async with create_task_group() as tg:
+        for command in ['first', 'second', 'third']:
+            tg.start_soon(run, command)
+
+    written = connection.connection.written
+    order = ''.join(written).split()
+
+    assert sorted(order) == ['first', 'second', 'third']
+    assert results == dict(zip(order, [['a: 1'], ['b: 2'], ['c: 3']]))
+    assert written == [f'{order[0]}\n', f'{order[1]}\n{order[2]}\n']
+
+
+@pytest.mark.anyio
+async def test_run_command_cancelled_while_writing(make_connection):
+    """Cancelling the task sending the data does not drop any command."""
+    connection = make_connection(['volume: 50', 'OK', 'OK', 'OK'])
+    fake = connection.connection
+    fake.write_gate = Event()
+    status_scope = CancelScope()
+    cleared = []
+
+    async def status():
+        with status_scope:
+            await connection.run_command('status')
+
+    async def clear():
+        cleared.append(await connection.run_command('clear'))
+
+    with fail_after(1):
+        async with create_task_group() as tg:
+            tg.start_soon(status)
+            await wait_all_tasks_blocked()
+            tg.start_soon(clear)
+            await wait_all_tasks_blocked()
+            status_scope.cancel()
+            fake.write_gate.set()
+
+        assert await connection.run_command('ping') == []
+
+    assert cleared == [[]]
+    assert fake.written == ['status\n', 'clear\n', 'ping\n']
+
+
+@pytest.mark.anyio
+async def test_run_command_max_in_flight(make_connection):
+    """Commands over the in-flight limit wait for a reply before being sent."""
+    connection = make_connection(
+        ['a: 1', 'OK', 'b: 2', 'OK', 'c: 3', 'OK'], max_in_flight=1
+    )
+    results = {}
+
+    async def run(command: str):
+        results[command] = await connection.run_command(command)
+
+    async with create_task_group() as tg:
+        for command in ['first', 'second', 'third']:
+            tg.start_soon(run, command)
+
+    written = connection.connection.written
+    order = [line.strip() for line in written]
+
+    assert sorted(order) == ['first', 'second', 'third']
+    assert results == dict(zip(order, [['a: 1'], ['b: 2'], ['c: 3']]))
+
+
+@pytest.mark.anyio
+async def test_run_command_cancelled(make_connection):
+    """The reply to a cancelled command is not taken by the next one."""
+    connection = make_connection(['a: 1', 'OK', 'b: 2', 'OK'])
+
+    with move_on_after(0):
+        await connection.run_command('first')
+
+    with fail_after(1):
+        assert await connection.run_command('second') == ['b: 2']
+
+    assert connection.connection.written == ['first\n', 'second\n']
+
+
+@pytest.mark.anyio
+async def test_run_command_write_failed(make_connection):
+    """A command that could not be written does not take a later reply."""
+    connection = make_connection(['a: 1', 'OK', 'c: 3', 'OK'])
+    fake = connection.connection
+
+    with move_on_after(0):
+        await connection.run_command('first')
+
+    # The reply to the cancelled command is still expected, so this command
+    # waits for the reply loop instead of reading inline.
+    fake.broken = True
+    with pytest.raises(BrokenResourceError):
+        await connection.run_command('second')
+
+    fake.broken = False
+    with fail_after(1):
+        assert await connection.run_command('third') == ['c: 3']
+
+    assert fake.written == ['first\n', 'third\n']
+
+
+@pytest.mark.anyio
+async def test_run_command_single_read(make_connection):
+    """Replies arriving in a single read are split into lines."""
+    connection = make_connection(['a: 1', 'b: 2', 'OK', 'c: 3', 'OK'], 1024)
+
+    assert await connection.run_command('first') == ['a: 1', 'b: 2']
+    assert await connection.run_command('second') == ['c: 3']
+
+
+@pytest.mark.anyio
+async def test_run_command_lines_like_terminators(make_connection):
+    """Lines starting like terminators do not end a response."""
+    replies = ['Album: OK', 'last-modified: 2021', 'OKish: 1', 'OK']
+    connection = make_connection(replies, 3)
+
+    assert await connection.run_command('currentsong') == replies[:-1]
+
+
+@pytest.mark.anyio
+async def test_run_commands(make_connection):
+    """A command list is sent at once and its replies are split."""
+    connection = make_connection(
+        ['volume: 50', 'list_OK', 'list_OK', 'songs: 2', 'list_OK', 'OK']
+    )
+
+    result = await connection.run_commands(['status', 'clear', 'stats'])
+
+    assert result == [['volume: 50'], [], ['songs: 2']]
+    assert connection.connection.written == [
+        'command_list_ok_begin\nstatus\nclear\nstats\ncommand_list_end\n'
+    ]
+
+
+@pytest.mark.anyio
+async def test_run_commands_error(make_connection):
+    """An error in a command list is raised, and later commands still work."""
+    connection = make_connection(
+        [
+            'list_OK',
+            'ACK [50@1] {add} No such directory',
+            'volume: 50',
+            'OK',
+        ]
+    )
+
+    with pytest.raises(URINotFoundError):
+        await connection.run_commands(['clear', 'add "x"', 'stats'])
+
+    assert await connection.run_command('status') == ['volume: 50']
+
+
+@pytest.mark.anyio
+async def test_client_run_command_not_connected():
+    """Running a command before connecting fails."""
+    client = BaseMPDClient()
+
+    with pytest.raises(ConnectionFailedError):
+        await client.run_command('status')
+
+
+@pytest.mark.anyio
+async def test_connection_run_command_not_connected():
+    """Running a command on an MPDConnection before connecting fails."""
+    async with create_task_group() as tg:
+        connection = MPDConnection(tg)
+
+        with pytest.raises(ConnectionFailedError):
+            await connection.run_command('status')
+
+        with pytest.raises(ConnectionFailedError):
+            await connection.run_commands(['status'])
+
+
+@pytest.mark.anyio
+async def test_client_pipeline(make_connection):
+    """A pipeline runs its commands as one command list when leaving."""
+    client = BaseMPDClient()
+    client.connection = make_connection(['volume: 50', 'list_OK', 'list_OK', 'OK'])
+
+    async with client.pipeline() as p:
+        p.add('status')
+        p.add('clear')
+
+    assert p.results == [['volume: 50'], []]
+    assert client.connection.connection.written == [
+        'command_list_ok_begin\nstatus\nclear\ncommand_list_end\n'
+    ]
+
+
+@pytest.mark.anyio
+async def test_client_batch(make_connection):
+    """A batch runs its calls as one command list and resumes each of them."""
+    client = BaseMPDClient()
+    client.connection = make_connection(['volume: 50', 'list_OK', 'list_OK', 'OK'])
+
+    async def volume() -> str:
+        (line,) = await client.run_command('status')
+        return line.partition(': ')[2]
+
+    async with client.batch() as b:
+        status = b.add(volume())
+        cleared = b.add(client.run_command('clear'))
+
+    assert await status.get() == '50'
+    assert await cleared.get() == []
+    assert client.connection.connection.written == [
+        'command_list_ok_begin\nstatus\nclear\ncommand_list_end\n'
+    ]
+
+
+@pytest.mark.anyio
+async def test_client_batch_error(make_connection):
+    """Every call in a batch fails if a command in it fails."""
+    client = BaseMPDClient()
+    client.connection = make_connection(
+        ['list_OK', 'ACK [50@1] {add} No such directory']
+    )
+
+    with pytest.raises(URINotFoundError):
+        async with client.batch() as b:
+            cleared = b.add(client.run_command('clear'))
+            added = b.add(client.run_command('add "nothing"'))
+
+    with pytest.raises(URINotFoundError):
+        await cleared.get()
+
+    with pytest.raises(URINotFoundError):
+        await added.get()
+
+
+@pytest.mark.anyio
+async def test_client_batch_cancelled(make_connection):
+    """The futures of a batch cancelled while running are failed."""
+    client = BaseMPDClient()
+    client.connection = make_connection(['list_OK', 'OK'])
+
+    with move_on_after(0):
+        async with client.batch() as b:
+            cleared = b.add(client.run_command('clear'))
+
+    with fail_after(1), pytest.raises(MPDError, match='may have run'):
+        await cleared.get()
+
+    assert client.connection.connection.written == [
+        'command_list_ok_begin\nclear\ncommand_list_end\n'
+    ]
+
+
+@pytest.mark.anyio
+async def test_client_batch_second_command(make_connection):
+    """A call that runs a second command fails and is closed."""
+    client = BaseMPDClient()
+    client.connection = make_connection(['volume: 50', 'list_OK', 'OK'])
+
+    async def status_and_clear():
+        await client.run_command('status')
+        await client.run_command('clear')
+
+    call = status_and_clear()
+
+    async with client.batch() as b:
+        result = b.add(call)
+
+    with pytest.raises(ClientTypeError):
+        await result.get()
+
+    assert getcoroutinestate(call) == CORO_CLOSED
+
+
+@pytest.mark.anyio
+async def test_client_batch_command_list_call(make_connection):
+    """A call that runs a command list is refused before sending anything."""
+    client = MPDClient()
+    client.connection = make_connection(['volume: 50', 'OK'])
+    client._run_command = client.connection.run_command  # pylint: disable=W0212
+
+    with pytest.raises(ClientTypeError):
+        async with client.batch() as b:
+            b.add(client.snapshot())
+
+    with fail_after(1):
+        assert await client.run_command('status') == ['volume: 50']
+
+    assert client.connection.connection.written == ['status\n']
+
+
+@pytest.mark.anyio
+async def test_client_batch_other_client(make_connection):
+    """A call to another client's method is refused before running it."""
+    client = MPDClient()
+    other = MPDClient()
+    other.connection = make_connection(['OK'])
+    other._run_command = other.connection.run_command  # pylint: disable=W0212
+
+    async with client.batch() as b:
+        with pytest.raises(ClientTypeError, match='batching client'):
+            b.add(other.status())
+
+    with fail_after(1):
+        assert await other.run_command('ping') == []
+
+    assert other.connection.connection.written == ['ping\n']
+
+
+@pytest.mark.anyio
+async def test_client_batch_discarded(make_connection):
+    """Nothing is sent if the block of a batch raises."""
+    client = BaseMPDClient()
+    client.connection = make_connection([])
+
+    with pytest.raises(ValueError):
+        async with client.batch() as b:
+            b.add(client.run_command('clear'))
+            raise ValueError()
+
+    assert client.connection.connection.written == []
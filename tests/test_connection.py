@@ -1,4 +1,5 @@
 """Tests for the connection module."""
+import socket
 from contextlib import AsyncExitStack, asynccontextmanager
 from dataclasses import dataclass
 from functools import partial
@@ -6,10 +7,17 @@ from pathlib import Path
 from typing import AsyncContextManager, AsyncIterator, Callable, Coroutine, List
 
 import pytest
-from anyio.abc import Listener, ObjectReceiveStream, SocketStream
+from anyio.abc import Listener, ObjectReceiveStream, SocketAttribute, SocketStream
 from typing_extensions import Protocol
 
-from ampdup.connection import Connection, ConnectionFailedError, Socket
+from ampdup.connection import (
+    Connection,
+    ConnectionFailedError,
+    Socket,
+    SocketOptions,
+    TCPConnector,
+    UnixConnector,
+)
 
 SocketHandler = Callable[[SocketStream], Coroutine[None, None, None]]
 
@@ -122,7 +130,7 @@ async def testing_server(tmp_path: Path, request) -> AsyncIterator[ServerTestDat
     server_factory = {
         'unix': ServerFactory(
             make_listener=partial(create_unix_listener, sock_path),
-            make_client=partial(Socket.connect_unix, sock_path),
+            make_client=UnixConnector(sock_path),
         ),
         'tcp': ServerFactory(
             make_listener=partial(
@@ -130,7 +138,7 @@ async def testing_server(tmp_path: Path, request) -> AsyncIterator[ServerTestDat
                 local_host=address,
                 local_port=port,
             ),
-            make_client=partial(Socket.connect_tcp, address, port),
+            make_client=TCPConnector(address, port),
         ),
     }[request.param]
 
@@ -259,6 +267,23 @@ async def test_connection_read_line_disconnected():
         _ = await connection.read_line()
 
 
+@pytest.mark.anyio
+async def test_connection_read_available_disconnected():
+    """Test that read_available signals error if there is no established connection."""
+    connection = Connection(fail_to_make_connector)
+
+    with pytest.raises(ConnectionFailedError):
+        _ = await connection.read_available()
+
+
+@pytest.mark.anyio
+async def test_connection_aclose_disconnected():
+    """Test that closing a connection that was never established does nothing."""
+    connection = Connection(fail_to_make_connector)
+
+    await connection.aclose()
+
+
 @pytest.mark.anyio
 async def test_connection_connect(testing_server: ServerTestData):
     """Test the Connection.connect method through the contextmanager interface."""
@@ -282,7 +307,7 @@ async def test_connection_connect_fail_if_server_replies_wrong_data(
 
         testing_server.handler.data = [b'NOT OK MPD\n']
 
-        with pytest.raises(ConnectionFailedError):
+        with pytest.raises(ConnectionFailedError, match='NOT OK MPD'):
             _ = await s.enter_async_context(Connection(testing_server.make_client))
 
 
@@ -321,3 +346,93 @@ async def test_connection_write_line(testing_server: ServerTestData):
         connection = await s.enter_async_context(Connection(testing_server.make_client))
 
         await connection.write_line('abcdefg')
+
+
+@pytest.mark.anyio
+async def test_socket_connect_tcp_nodelay(testing_server: ServerTestData):
+    """Test that TCP sockets are created with Nagle's algorithm disabled."""
+    async with AsyncExitStack() as s:
+        await s.enter_async_context(testing_server.serve())
+        client = await s.enter_async_context(await testing_server.make_client())
+
+        raw_socket = client.sock.extra(SocketAttribute.raw_socket)
+
+        if raw_socket.family not in (socket.AF_INET, socket.AF_INET6):
+            pytest.skip('Unix sockets have no TCP options.')
+
+        assert raw_socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+
+
+@pytest.mark.anyio
+async def test_socket_read_available(testing_server: ServerTestData):
+    """Test for the socket.read_available method."""
+    async with AsyncExitStack() as s:
+        await s.enter_async_context(testing_server.serve())
+        socket = await s.enter_async_context(await testing_server.make_client())
+
+        assert await socket.read_available() == b'Test data.\n'
+
+
+@pytest.mark.anyio
+async def test_socket_read_available_timeout(testing_server: ServerTestData):
+    """Test for the socket.read_available method in case no data ever comes."""
+    from ampdup.errors import ReceiveError
+
+    testing_server.handler.data = []
+
+    async with AsyncExitStack() as s:
+        await s.enter_async_context(testing_server.serve())
+        socket = await s.enter_async_context(await testing_server.make_client())
+
+        with pytest.raises(ReceiveError):
+            await socket.read_available(timeout_seconds=0.1)
+
+
+@pytest.mark.anyio
+async def test_socket_options_buffer_sizes(testing_server: ServerTestData):
+    """Test that SocketOptions sets the kernel buffer sizes."""
+    async with AsyncExitStack() as s:
+        await s.enter_async_context(testing_server.serve())
+        client = await s.enter_async_context(await testing_server.make_client())
+
+        raw_socket = client.sock.extra(SocketAttribute.raw_socket)
+        default = raw_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+        SocketOptions(receive_buffer_size=default * 2).apply(client.sock)
+
+        assert raw_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) > default
+
+
+@pytest.mark.anyio
+async def test_socket_connect_tcp_keepalive(testing_server: ServerTestData):
+    """Test that TCP sockets are created with keepalive probes enabled."""
+    async with AsyncExitStack() as s:
+        await s.enter_async_context(testing_server.serve())
+        client = await s.enter_async_context(await testing_server.make_client())
+
+        raw_socket = client.sock.extra(SocketAttribute.raw_socket)
+
+        if raw_socket.family not in (socket.AF_INET, socket.AF_INET6):
+            pytest.skip('Unix sockets have no TCP options.')
+
+        assert raw_socket.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+
+
+@pytest.mark.anyio
+@pytest.mark.skipif(
+    not hasattr(socket, 'TCP_KEEPIDLE'), reason='TCP_KEEPIDLE is not available.'
+)
+async def test_socket_options_keepalive_idle(testing_server: ServerTestData):
+    """Test that SocketOptions sets the keepalive idle time."""
+    async with AsyncExitStack() as s:
+        await s.enter_async_context(testing_server.serve())
+        client = await s.enter_async_context(await testing_server.make_client())
+
+        raw_socket = client.sock.extra(SocketAttribute.raw_socket)
+
+        if raw_socket.family not in (socket.AF_INET, socket.AF_INET6):
+            pytest.skip('Unix sockets have no TCP options.')
+
+        SocketOptions(keepalive_idle_seconds=30).apply_tcp(client.sock)
+
+        assert raw_socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == 30
@@ -90,3 +90,16 @@ async def test_future_set_after_get() -> None:
         tg.start_soon(get_future, f)
         await will_get.wait()
         f.set(3)
+
+
+@pytest.mark.anyio
+async def test_reset_future() -> None:
+    """Check that a reset future can be set again."""
+    f: Future[int] = Future()
+
+    f.set(1)
+    assert await f.get() == 1
+
+    f.reset()
+    f.set(2)
+    assert await f.get() == 2
@@ -0,0 +1,33 @@
+"""Tests for the idle client."""
+from typing import List
+
+import pytest
+
+from ampdup.idle_client import IdleMPDClient
+from ampdup.types import Subsystem
+
+
+@pytest.mark.anyio
+async def test_watch_reissues_idle():
+    """Each change is yielded and followed by a new idle command."""
+    replies = [['changed: player'], ['changed: mixer', 'changed: options']]
+    sent: List[str] = []
+
+    async def run_command(command: str) -> List[str]:
+        sent.append(command)
+        return replies[len(sent) - 1]
+
+    client = IdleMPDClient()
+    client._run_command = run_command  # pylint: disable=protected-access
+
+    changes = []
+    async for changed in client.watch(Subsystem.PLAYER, Subsystem.MIXER):
+        changes.append(changed)
+        if len(changes) == len(replies):
+            break
+
+    assert changes == [
+        [Subsystem.PLAYER],
+        [Subsystem.MIXER, Subsystem.OPTIONS],
+    ]
+    assert sent == ['idle player mixer', 'idle player mixer']
@@ -1,6 +1,15 @@
 """Tests for base parsing utilities."""
+import pytest
+
 from ampdup.errors import CommandError, ErrorCode, URINotFoundError
-from ampdup.parsing import normalize, parse_error, parse_single
+from ampdup.parsing import (
+    NORMALIZED_NAMES,
+    IncompatibleErrorMessage,
+    normalize,
+    parse_error,
+    parse_single,
+    split_item,
+)
 
 
 def test_normalize():
@@ -10,6 +19,28 @@ def test_normalize():
     assert normalize('Last-Modified') == 'last_modified'
 
 
+def test_normalize_cached():
+    """Normalized names are kept for the next time they are seen."""
+    assert 'Audio-Format' not in NORMALIZED_NAMES
+    assert normalize('Audio-Format') == 'audio_format'
+    assert 'Audio-Format' in NORMALIZED_NAMES
+
+
+def test_split_item():
+    """Split an item at the first ': ', keeping the value as sent."""
+    assert split_item('file: a: b.flac') == ('file', 'a: b.flac')
+    assert split_item('Title:  spaced ') == ('Title', ' spaced ')
+
+
+def test_split_item_other_spacing():
+    """Split an item without the usual spacing, stripping both sides."""
+    assert split_item('key:value ') == ('key', 'value')
+    assert split_item('key :') == ('key', '')
+
+    with pytest.raises(ValueError):
+        split_item('no separator')
+
+
 def test_parse_unknown_command_error():
     """Parse an unknown command error."""
 
@@ -30,6 +61,31 @@ def test_parse_not_found_error():
     assert parse_error(ack_line, []) == expected
 
 
+def test_command_error_message():
+    """Command errors render the ACK data as their message."""
+
+    error = URINotFoundError(0, 'add', 'No such directory', [])
+
+    assert str(error) == '[NO_EXIST/50@0] {add} No such directory'
+
+
+def test_parse_error_message_with_braces():
+    """Braces in the message do not end up in the command."""
+
+    ack_line = 'ACK [2@1] {find} Unknown filter type {x}'
+
+    expected = CommandError(ErrorCode.ARG, 1, 'find', 'Unknown filter type {x}', [])
+
+    assert parse_error(ack_line, []) == expected
+
+
+def test_parse_incompatible_error():
+    """Lines not in the ACK format are rejected."""
+
+    with pytest.raises(IncompatibleErrorMessage):
+        parse_error('ACK 5@0 {} unknown command', [])
+
+
 def test_parse_single_result():
     """Parse a single result."""
     result = ['name: value']
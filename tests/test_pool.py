@@ -0,0 +1,190 @@
+"""Tests for the pool module."""
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List
+
+import pytest
+from anyio import BrokenResourceError, Event, create_task_group, move_on_after
+
+from ampdup.connection import Socket
+from ampdup.errors import ConnectionFailedError
+from ampdup.pool import MPDClientPool
+
+
+@dataclass
+class FakeStream:
+    """A stream that greets like MPD and answers every command with OK."""
+
+    replies: bytearray = field(default_factory=lambda: bytearray(b'OK MPD 0.23.5\n'))
+    has_replies: Event = field(default_factory=Event)
+    sent: bytearray = field(default_factory=bytearray)
+    closed: bool = False
+    broken: bool = False
+    silent: bool = False
+
+    async def send(self, data: bytes):
+        """Record the data and queue an OK for every line, unless silent."""
+        if self.broken:
+            raise BrokenResourceError
+        self.sent += data
+        if self.silent:
+            return
+        self.replies += b'OK\n' * data.count(b'\n')
+        self.has_replies.set()
+
+    async def receive(self) -> bytes:
+        """Return every queued reply, waiting for some if there is none."""
+        while not self.replies:
+            await self.has_replies.wait()
+            self.has_replies = Event()
+
+        data = bytes(self.replies)
+        self.replies.clear()
+        return data
+
+    async def aclose(self):
+        """Mark the stream as closed."""
+        self.closed = True
+
+
+@dataclass
+class FakeConnector:
+    """A Connector that creates sockets over fake streams."""
+
+    streams: List[FakeStream] = field(default_factory=list)
+
+    async def __call__(self) -> Socket:
+        stream = FakeStream()
+        self.streams.append(stream)
+        return Socket(stream)  # type: ignore
+
+
+@pytest.fixture
+async def pool() -> AsyncIterator[MPDClientPool]:
+    """Fixture for a pool of clients connected to fake streams."""
+    async with create_task_group() as tg:
+        p = MPDClientPool(tg, FakeConnector(), max_size=2)
+        yield p
+        await p.aclose()
+
+
+@pytest.mark.anyio
+async def test_pool_reuses_clients(pool):
+    """A released client is lent again instead of connecting anew."""
+    async with pool.client() as first:
+        await first.run_command('ping')
+
+    async with pool.client() as second:
+        await second.run_command('ping')
+
+    assert first is second
+    assert len(pool.connector.streams) == 1
+
+
+@pytest.mark.anyio
+async def test_pool_connects_concurrent_clients(pool):
+    """Clients borrowed at the same time use different connections."""
+    async with pool.client() as first, pool.client() as second:
+        assert first is not second
+        await first.run_command('ping')
+        await second.run_command('ping')
+
+    assert len(pool.connector.streams) == 2
+
+
+@pytest.mark.anyio
+async def test_pool_discards_failed_clients(pool):
+    """A client whose block raised is disconnected instead of reused."""
+    with pytest.raises(ConnectionFailedError):
+        async with pool.client():
+            raise ConnectionFailedError('Broken.')
+
+    assert pool.connector.streams[0].closed
+
+    async with pool.client() as client:
+        await client.run_command('ping')
+
+    assert len(pool.connector.streams) == 2
+
+
+@pytest.mark.anyio
+async def test_pool_aclose_disconnects_clients():
+    """Closing the pool disconnects the clients in it."""
+    connector = FakeConnector()
+
+    async with create_task_group() as tg:
+        pool = MPDClientPool(tg, connector)
+
+        async with pool.client() as client:
+            await client.run_command('ping')
+
+        await pool.aclose()
+
+    assert connector.streams[0].closed
+
+
+@pytest.mark.anyio
+async def test_pool_validates_stale_clients():
+    """A client idle for too long is pinged and reused if it answers."""
+    connector = FakeConnector()
+
+    async with create_task_group() as tg:
+        pool = MPDClientPool(tg, connector, idle_threshold_seconds=-1)
+
+        async with pool.client() as first:
+            pass
+
+        assert connector.streams[0].sent == b''
+
+        async with pool.client() as second:
+            pass
+
+        assert first is second
+        assert connector.streams[0].sent == b'ping\n'
+        await pool.aclose()
+
+    assert len(connector.streams) == 1
+
+
+@pytest.mark.anyio
+async def test_pool_replaces_broken_stale_clients():
+    """A client idle for too long that fails the ping is replaced."""
+    connector = FakeConnector()
+
+    async with create_task_group() as tg:
+        pool = MPDClientPool(tg, connector, idle_threshold_seconds=-1)
+
+        async with pool.client() as first:
+            pass
+
+        connector.streams[0].broken = True
+
+        async with pool.client() as second:
+            await second.run_command('ping')
+
+        assert first is not second
+        await pool.aclose()
+
+    assert len(connector.streams) == 2
+    assert connector.streams[0].closed
+
+
+@pytest.mark.anyio
+async def test_pool_disconnects_clients_cancelled_while_validated():
+    """A client whose ping is cancelled is disconnected, not lost."""
+    connector = FakeConnector()
+
+    async with create_task_group() as tg:
+        pool = MPDClientPool(tg, connector, idle_threshold_seconds=-1)
+
+        async with pool.client():
+            pass
+
+        connector.streams[0].silent = True
+
+        with move_on_after(0.05):
+            async with pool.client():
+                pass
+
+        assert connector.streams[0].sent == b'ping\n'
+        assert connector.streams[0].closed
+        await pool.aclose()
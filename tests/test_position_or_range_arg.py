@@ -0,0 +1,20 @@
+"""Tests for position_or_range_arg."""
+from ampdup.mpd_client import position_or_range_arg
+
+
+def test_no_position():
+    """Check that no position makes no argument."""
+    assert position_or_range_arg(None) == ''
+
+
+def test_positions():
+    """Check that small and large positions make the same kind of argument."""
+    assert position_or_range_arg(0) == ' 0'
+    assert position_or_range_arg(255) == ' 255'
+    assert position_or_range_arg(256) == ' 256'
+    assert position_or_range_arg(-1) == ' -1'
+
+
+def test_range():
+    """Check that ranges are formatted as start:end."""
+    assert position_or_range_arg((1, 5)) == ' 1:5'
@@ -0,0 +1,24 @@
+"""Tests for quoting command arguments."""
+from ampdup.mpd_client import find_args, quote
+from ampdup.types import SearchType, Tag
+
+
+def test_quote_plain():
+    """Check that plain arguments are only surrounded by quotes."""
+    assert quote('Music/song.flac') == '"Music/song.flac"'
+
+
+def test_quote_escapes():
+    """Check that quotes and backslashes in arguments are escaped."""
+    assert quote('say "hi" \\o/') == '"say \\"hi\\" \\\\o/"'
+
+
+def test_find_args_quoted():
+    """Check that search queries are quoted."""
+    assert find_args([(Tag.ARTIST, 'The "Band"')]) == 'artist "The \\"Band\\""'
+
+
+def test_find_args_search_types():
+    """Check that special search types and tags are both written as values."""
+    queries = [(SearchType.ANY, 'x'), (Tag.ALBUMARTIST, 'y')]
+    assert find_args(queries) == 'any "x" albumartist "y"'
@@ -0,0 +1,19 @@
+"""Tests for time_range_arg."""
+from ampdup.mpd_client import time_range_arg
+from ampdup.types import TimeRange
+
+
+def test_open_range():
+    """Check that a range open on both ends is a lone colon."""
+    assert time_range_arg(TimeRange((None, None))) == ':'
+
+
+def test_half_open_ranges():
+    """Check that an open end leaves its side of the colon empty."""
+    assert time_range_arg(TimeRange((1.5, None))) == '1.5:'
+    assert time_range_arg(TimeRange((None, 30))) == ':30'
+
+
+def test_closed_range():
+    """Check that zero offsets are kept, not taken as open ends."""
+    assert time_range_arg(TimeRange((0, 12.25))) == '0:12.25'
@@ -1,9 +1,16 @@
 """Tests for the util module."""
 from enum import Enum
+from typing import NamedTuple, Optional
 
 from pytest import raises
 
-from ampdup.util import EmptyEnumError, NoCommonTypeError, underlying_type
+from ampdup.util import (
+    EmptyEnumError,
+    NoCommonTypeError,
+    command_name,
+    converter,
+    underlying_type,
+)
 
 
 def test_underlying_type_heterogeneous_enum():
@@ -51,3 +58,34 @@ def test_underlying_type_string_enum():
         B = 'B'
 
     assert underlying_type(TestEnum) is str
+
+
+def test_command_name():
+    """Check that command_name drops the arguments of a command."""
+    assert command_name('idle') == 'idle'
+    assert command_name('idle player mixer') == 'idle'
+    assert command_name('idleness') == 'idleness'
+
+
+def test_converter_namedtuple():
+    """Check that a converter builds a NamedTuple from strings."""
+
+    class Color(Enum):
+        """Test enumeration."""
+
+        RED = 1
+
+    class Item(NamedTuple):
+        """Test NamedTuple."""
+
+        name: str
+        amount: Optional[int] = None
+        color: Optional[Color] = None
+
+    convert = converter(Item)
+
+    assert convert({'name': 'a', 'amount': '3', 'color': '1'}) == Item(
+        'a', 3, Color.RED
+    )
+    assert convert({'name': 'b'}) == Item('b')
+    assert converter(Item) is convert